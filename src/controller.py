@@ -3,18 +3,129 @@ import shutil
 import os
 import json
 import logging
-from gi.repository import GLib, GObject
+import base64
+import secrets
+import socket
+import threading
+import urllib.request
+import configparser
+import re
+import time
+from gi.repository import GLib, GObject, Gio
+
+from metrics import MetricsExporter
+from sync import SyncManager
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("ProtonDriveController")
 
+USER_FILE = os.path.expanduser("~/.config/protondrive-gui/user.json")
+QUOTA_CACHE_FILE = os.path.expanduser("~/.cache/protondrive-gui/quota.json")
+SETTINGS_FILE = os.path.expanduser("~/.config/protondrive-gui/settings.json")
+
+DEFAULT_SETTINGS = {
+    # Mount resource limits, None leaves rclone unconstrained
+    "memory_limit_mb": None,   # GOMEMLIMIT and cgroup MemoryHigh
+    "cpu_weight": None,        # cgroup CPUWeight (1-10000, default 100)
+    "io_weight": None,         # cgroup IOWeight (1-10000, default 100)
+    # Prometheus textfile export, None disables it
+    "metrics_file": None,
+    "metrics_interval": 15,
+    # Two-way synced folders: [{"local": "~/Offline", "remote": "Offline", "interval": 900}]
+    "sync_folders": [],
+    "sync_interval": 900,      # default seconds between scheduled syncs
+    "sync_transfers": 4,
+}
+
+# Minimum rclone version for optional features
+RCLONE_FEATURES = {
+    "bisync": (1, 58, 0),
+    "bisync-recover": (1, 66, 0),
+    "rc-metrics": (1, 56, 0),
+}
+
+def _is_number(value, low=None, high=None):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    return (low is None or value >= low) and (high is None or value <= high)
+
+# Checks for hand-edited settings; a value failing its check is logged and
+# replaced by the default
+SETTING_CHECKS = {
+    "memory_limit_mb": (lambda v: _is_number(v, low=1), "a positive number"),
+    "cpu_weight": (lambda v: _is_number(v, 1, 10000), "a number from 1 to 10000"),
+    "io_weight": (lambda v: _is_number(v, 1, 10000), "a number from 1 to 10000"),
+    "metrics_file": (lambda v: isinstance(v, str) and v != "", "a file path"),
+    "metrics_interval": (lambda v: _is_number(v, low=1), "a number of seconds, at least 1"),
+    "sync_folders": (lambda v: isinstance(v, list), "a list of folders"),
+    "sync_interval": (lambda v: _is_number(v, low=1), "a number of seconds, at least 1"),
+    "sync_transfers": (lambda v: _is_number(v, low=1), "a number, at least 1"),
+}
+
+def systemd_user_manager_available():
+    """True if systemd-run --user can reach the user manager (no spawn needed)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir:
+        return False
+    return os.path.exists(os.path.join(runtime_dir, "systemd", "private")) \
+        or os.path.exists(os.path.join(runtime_dir, "bus"))
+
+def read_process_usage(pid):
+    """Returns (rss_bytes, cpu_ticks) for pid from /proc, or (None, None)."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        # utime and stime are fields 14 and 15, rss (pages) is field 24
+        cpu_ticks = int(fields[11]) + int(fields[12])
+        rss = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        return rss, cpu_ticks
+    except Exception:
+        return None, None
+
+def read_memory_high_events(pid):
+    """Returns how often pid's cgroup hit memory.high (reclaim throttling), or None."""
+    try:
+        with open(f"/proc/{pid}/cgroup", "r") as f:
+            cgroup = f.readline().strip().split("::", 1)[1]
+        with open(f"/sys/fs/cgroup{cgroup}/memory.events", "r") as f:
+            for line in f:
+                key, value = line.split()
+                if key == "high":
+                    return int(value)
+    except Exception:
+        pass
+    return None
+
+def rclone_config_path():
+    """Resolves rclone.conf the way rclone does, without spawning it."""
+    if os.environ.get("RCLONE_CONFIG"):
+        return os.path.expanduser(os.environ["RCLONE_CONFIG"])
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    xdg_path = os.path.join(config_home, "rclone", "rclone.conf")
+    if os.path.exists(xdg_path):
+        return xdg_path
+    # Legacy location, only used when the XDG file does not exist
+    legacy = os.path.expanduser("~/.rclone.conf")
+    if os.path.exists(legacy):
+        return legacy
+    return xdg_path
+
 class ProtonDriveController(GObject.Object):
     __gsignals__ = {
         'mount-error': (GObject.SignalFlags.RUN_LAST, None, (str,)),
-        'mount-log': (GObject.SignalFlags.RUN_LAST, None, (str,))
+        'mount-log': (GObject.SignalFlags.RUN_LAST, None, (str,)),
+        'mount-ready': (GObject.SignalFlags.RUN_LAST, None, (str,)),
+        'mount-stats': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+        'quota-changed': (GObject.SignalFlags.RUN_LAST, None, (GObject.TYPE_INT64, GObject.TYPE_INT64))
     }
 
+    # Seconds before a cached quota is considered stale
+    QUOTA_TTL = 15 * 60
+
+    # Seconds between rc stats polls while mounted
+    STATS_INTERVAL = 1.0
+
     def __init__(self):
         super().__init__()
         self.rclone_path = shutil.which("rclone")
@@ -23,34 +134,165 @@ class ProtonDriveController(GObject.Object):
             self.rclone_path = "/app/bin/rclone"
 
         self.config_name = "proton"
-        
+        self.rc_addr = None
+        self.rc_auth = None
+        self.uploads_paused = False
+        self.stats_stop = threading.Event()
+        self.quota_refreshing = False
+        self.quota_timer_id = 0
+
+        # Mount lifecycle counters, read by the metrics exporter
+        self.mount_starts = 0
+        self.mount_unexpected_exits = 0
+        self.time_to_mount = None
+        # Set from start until the mount point is live, or we give up on it
+        self.mount_waiting_ready = False
+
+        # Parsed state, dropped when the backing file changes on disk
+        self._cache = {}
+        self._monitors = []
+        self.rclone_config = rclone_config_path()
+        self._watch(self.rclone_config, "remotes")
+        self._watch(USER_FILE, "user")
+        self._watch(SETTINGS_FILE, "settings")
+        if self.rclone_path:
+            self._watch(self.rclone_path, "version")
+
+        self.sync = SyncManager(self)
+
+        self.metrics = None
+        if self.get_settings().get("metrics_file"):
+            self.metrics = MetricsExporter(self)
+            self.metrics.start()
+
+    def _watch(self, path, *keys):
+        """Invalidates the given cache keys whenever path changes."""
+        try:
+            monitor = Gio.File.new_for_path(path).monitor_file(Gio.FileMonitorFlags.NONE, None)
+        except GLib.Error as e:
+            logger.warning(f"Cannot watch {path}: {e}")
+            return
+        monitor.connect('changed', lambda *args: self.invalidate(*keys))
+        self._monitors.append(monitor)
+
+    def invalidate(self, *keys):
+        """Drops cached values; with no keys drops everything."""
+        if not keys:
+            self._cache.clear()
+        for key in keys:
+            self._cache.pop(key, None)
+
+    def _cached(self, key, loader):
+        if key not in self._cache:
+            self._cache[key] = loader()
+        return self._cache[key]
+
     def check_installation(self):
         """Checks if rclone is installed."""
         if not self.rclone_path:
             return False, "rclone binary not found."
         return True, f"Found rclone at {self.rclone_path}"
 
+    def get_settings(self):
+        """Returns settings.json merged over DEFAULT_SETTINGS."""
+        return self._cached("settings", self._load_settings)
+
+    def _load_settings(self):
+        settings = dict(DEFAULT_SETTINGS)
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r') as f:
+                    settings.update(json.load(f))
+        except Exception as e:
+            logger.error(f"Failed to read settings: {e}")
+
+        for key, (check, expected) in SETTING_CHECKS.items():
+            value = settings.get(key)
+            if value is not None and not check(value):
+                logger.error(f"Ignoring setting {key}={value!r}: expected {expected}")
+                settings[key] = DEFAULT_SETTINGS[key]
+        return settings
+
     def check_config(self):
         """Checks if the proton remote is already configured."""
         if not self.rclone_path:
             return False
-            
+        return self.config_name in self.get_remotes()
+
+    def get_remotes(self):
+        """Returns the set of configured remote names."""
+        return self._cached("remotes", self._load_remotes)
+
+    def _load_remotes(self):
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        try:
+            parser.read(self.rclone_config)
+            return set(parser.sections())
+        except configparser.Error:
+            # Encrypted or unreadable config, only rclone can list it
+            pass
+
         try:
-            # List remotes to see if 'proton' exists
             result = subprocess.run(
                 [self.rclone_path, "listremotes"], 
                 capture_output=True, 
                 text=True
             )
-            return f"{self.config_name}:" in result.stdout
+            return {line.rstrip(":") for line in result.stdout.split()}
         except Exception as e:
             logger.error(f"Error checking config: {e}")
-            return False
+            return set()
+
+    def get_rclone_version(self):
+        """Returns the rclone version as a (major, minor, patch) tuple, or None."""
+        return self._cached("version", self._load_rclone_version)
+
+    def _load_rclone_version(self):
+        if not self.rclone_path:
+            return None
+        try:
+            result = subprocess.run(
+                [self.rclone_path, "version"],
+                capture_output=True,
+                text=True
+            )
+            match = re.search(r"rclone v(\d+)\.(\d+)\.(\d+)", result.stdout)
+            if match:
+                return tuple(int(part) for part in match.groups())
+        except Exception as e:
+            logger.error(f"Failed to get rclone version: {e}")
+        return None
+
+    def preload_rclone_version(self):
+        """Fills the version cache from a background thread, for callers that must not block."""
+        if "version" in self._cache:
+            return
+
+        def _run():
+            version = self._load_rclone_version()
+            GLib.idle_add(self._on_version_loaded, version)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _on_version_loaded(self, version):
+        # The cache is only touched on the main loop
+        self._cache.setdefault("version", version)
+        return False
+
+    def rclone_supports(self, feature):
+        """True if the installed rclone is new enough for a RCLONE_FEATURES entry."""
+        version = self.get_rclone_version()
+        return version is not None and version >= RCLONE_FEATURES[feature]
 
     def get_quota(self):
-        """Returns (used, total) bytes or (None, None) on error."""
+        """Returns (used, total) bytes or (None, None) on error. Blocking."""
         if not self.rclone_path:
             return None, None
+
+        # Reuse the running mount's session instead of logging in again
+        data = self.rc_call("operations/about", {"fs": self.get_remote_name()}, timeout=30)
+        if data is not None:
+            return data.get("used", 0), data.get("total", 0)
             
         try:
             # rclone about remote: --json
@@ -64,7 +306,6 @@ class ProtonDriveController(GObject.Object):
                 logger.error(f"Error checking quota: {result.stderr}")
                 return None, None
                 
-            import json
             data = json.loads(result.stdout)
             return data.get("used", 0), data.get("total", 0)
             
@@ -72,12 +313,78 @@ class ProtonDriveController(GObject.Object):
             logger.error(f"Failed to get quota: {e}")
             return None, None
 
+    def get_cached_quota(self):
+        """Returns (used, total, age_seconds) from the quota cache file, or (None, None, None)."""
+        try:
+            with open(QUOTA_CACHE_FILE, 'r') as f:
+                data = json.load(f)
+            if data.get("username") != self.get_current_user():
+                return None, None, None
+            return data["used"], data["total"], max(0, time.time() - data["timestamp"])
+        except Exception:
+            return None, None, None
+
+    def _save_quota(self, used, total):
+        try:
+            os.makedirs(os.path.dirname(QUOTA_CACHE_FILE), exist_ok=True)
+            tmp_path = QUOTA_CACHE_FILE + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "username": self.get_current_user(),
+                    "used": used,
+                    "total": total,
+                    "timestamp": time.time()
+                }, f)
+            os.replace(tmp_path, QUOTA_CACHE_FILE)
+        except Exception as e:
+            logger.error(f"Failed to save quota cache: {e}")
+
+    def refresh_quota(self):
+        """
+        Refreshes the quota in a background thread if the cache is stale.
+        Concurrent requests share one fetch. Emits 'quota-changed' on success.
+        """
+        if not self.quota_timer_id:
+            # Check at a fraction of the TTL so the cache is never much older than it
+            self.quota_timer_id = GLib.timeout_add_seconds(self.QUOTA_TTL // 4, self._quota_tick)
+
+        if self.quota_refreshing or not self.check_config():
+            return
+        # Mount starting but rc not up yet: wait for 'mount-ready' rather than
+        # falling back to a separate 'rclone about' process
+        if self.mount_waiting_ready and self.is_mounted():
+            return
+        _, _, age = self.get_cached_quota()
+        if age is not None and age < self.QUOTA_TTL:
+            return
+
+        self.quota_refreshing = True
+
+        def _run():
+            used, total = self.get_quota()
+            if used is not None and total:
+                self._save_quota(used, total)
+            GLib.idle_add(self._on_quota_fetched, used, total)
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _on_quota_fetched(self, used, total):
+        self.quota_refreshing = False
+        if used is not None and total:
+            self.emit('quota-changed', used, total)
+        return False
+
+    def _quota_tick(self):
+        self.refresh_quota()
+        return True
+
     def get_current_user(self):
+        return self._cached("user", self._load_current_user)
+
+    def _load_current_user(self):
         try:
-             user_file = os.path.expanduser("~/.config/protondrive-gui/user.json")
-             if os.path.exists(user_file):
-                 import json
-                 with open(user_file, 'r') as f:
+             if os.path.exists(USER_FILE):
+                 with open(USER_FILE, 'r') as f:
                      data = json.load(f)
                      return data.get("username")
         except: pass
@@ -89,8 +396,9 @@ class ProtonDriveController(GObject.Object):
             return False
             
         try:
-            # Stop mount first if active
+            # Stop mount and folder sync first if active
             self.stop_mount()
+            self.sync.stop()
             
             logger.info(f"Deleting remote {self.config_name}")
             subprocess.run(
@@ -98,9 +406,11 @@ class ProtonDriveController(GObject.Object):
                 check=True
             )
             # Also remove user info
-            try:
-                os.remove(os.path.expanduser("~/.config/protondrive-gui/user.json"))
-            except: pass
+            for path in (USER_FILE, QUOTA_CACHE_FILE):
+                try:
+                    os.remove(path)
+                except: pass
+            self.invalidate("remotes", "user")
             
             return True
         except Exception as e:
@@ -180,14 +490,14 @@ class ProtonDriveController(GObject.Object):
                 if process.returncode == 0:
                     # Save username for display
                     try:
-                         user_file = os.path.expanduser("~/.config/protondrive-gui/user.json")
-                         if not os.path.exists(os.path.dirname(user_file)):
-                             os.makedirs(os.path.dirname(user_file), exist_ok=True)
+                         if not os.path.exists(os.path.dirname(USER_FILE)):
+                             os.makedirs(os.path.dirname(USER_FILE), exist_ok=True)
                          
-                         import json
-                         with open(user_file, 'w') as f:
+                         with open(USER_FILE, 'w') as f:
                              json.dump({"username": username}, f)
                     except: pass
+                    # Do not wait for the file monitor to catch up
+                    GLib.idle_add(self.invalidate, "remotes", "user")
 
                     GLib.idle_add(callback, True, "Login successful!")
                 else:
@@ -222,6 +532,171 @@ class ProtonDriveController(GObject.Object):
         if not os.path.exists(path):
             os.makedirs(path, exist_ok=True)
             
+    def _setup_rc(self):
+        """Picks a loopback port and random credentials for the mount's rc API."""
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        user = "protondrive-gui"
+        password = secrets.token_urlsafe(24)
+        self.rc_addr = f"127.0.0.1:{port}"
+        self.rc_auth = "Basic " + base64.b64encode(f"{user}:{password}".encode()).decode()
+
+        # Credentials go through the environment so they do not show up in ps
+        env = os.environ.copy()
+        env["RCLONE_RC_USER"] = user
+        env["RCLONE_RC_PASS"] = password
+        args = ["--rc", "--rc-addr", self.rc_addr]
+        # Only when something reads /metrics, and without running 'rclone
+        # version' here on the main loop: the exporter preloads it
+        if self.metrics:
+            if "version" not in self._cache:
+                logger.warning("rclone version not known yet, mounting without rc metrics")
+                self.preload_rclone_version()
+            elif self.rclone_supports("rc-metrics"):
+                args.append("--rc-enable-metrics")
+        return args, env
+
+    def rc_call(self, method, params=None, timeout=2):
+        """Calls the running mount's rc API. Returns the decoded reply or None."""
+        if not self.rc_addr or not self.is_mounted():
+            return None
+        request = urllib.request.Request(
+            f"http://{self.rc_addr}/{method}",
+            data=json.dumps(params or {}).encode(),
+            headers={"Content-Type": "application/json", "Authorization": self.rc_auth}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return json.loads(response.read())
+        except Exception as e:
+            logger.debug(f"rc {method} failed: {e}")
+            return None
+
+    def rc_get_metrics(self, timeout=2):
+        """Returns the mount's Prometheus metrics text (needs --rc-enable-metrics), or None."""
+        if not self.rc_addr or not self.is_mounted():
+            return None
+        request = urllib.request.Request(
+            f"http://{self.rc_addr}/metrics",
+            headers={"Authorization": self.rc_auth}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return response.read().decode("utf-8", "replace")
+        except Exception as e:
+            logger.debug(f"rc metrics failed: {e}")
+            return None
+
+    def get_mount_stats(self):
+        """Returns live transfer and resource stats for the mount, or None if not mounted."""
+        if not self.is_mounted():
+            return None
+        # rc may not be up yet right after start, report zeros until it is
+        core = self.rc_call("core/stats") or {}
+        vfs = self.rc_call("vfs/stats") or {}
+        cache = vfs.get("diskCache", {})
+        stats = {
+            "speed": int(core.get("speed", 0)),
+            "bytes": core.get("bytes", 0),
+            "errors": core.get("errors", 0),
+            "last_error": core.get("lastError") or None,
+            "pending": cache.get("uploadsInProgress", 0) + cache.get("uploadsQueued", 0),
+            "cache_bytes": cache.get("bytesUsed", 0),
+            "paused": self.uploads_paused,
+        }
+        stats.update(self.get_process_usage())
+        return stats
+
+    def get_process_usage(self):
+        """
+        Samples the mount process from /proc: RSS, CPU percent since the last
+        sample and whether its cgroup hit memory.high since the last sample.
+        """
+        pid = self.mount_process.pid
+        rss, ticks = read_process_usage(pid)
+        high_events = read_memory_high_events(pid)
+        now = time.monotonic()
+
+        cpu = None
+        throttled = False
+        last = getattr(self, 'usage_sample', None)
+        if last and last[0] == pid:
+            _, last_time, last_ticks, last_high = last
+            if ticks is not None and last_ticks is not None and now > last_time:
+                cpu = 100.0 * (ticks - last_ticks) / os.sysconf("SC_CLK_TCK") / (now - last_time)
+            throttled = high_events is not None and last_high is not None and high_events > last_high
+        self.usage_sample = (pid, now, ticks, high_events)
+
+        return {"rss": rss, "cpu": cpu, "throttled": throttled}
+
+    def _stats_poller(self):
+        """Background thread: polls rc stats and hands them to the main loop."""
+        while not self.stats_stop.wait(self.STATS_INTERVAL):
+            if not self.is_mounted():
+                break
+            stats = self.get_mount_stats()
+            if stats is not None:
+                GLib.idle_add(self.emit, 'mount-stats', stats)
+
+    def set_uploads_paused(self, paused, callback):
+        """
+        Pauses uploads by throttling the upload bandwidth to 1 KiB/s, or lifts
+        the limit. The rc call runs in a thread; callback(success) runs on the main loop.
+        """
+        rate = "1:off" if paused else "off"
+
+        def _run():
+            ok = self.rc_call("core/bwlimit", {"rate": rate}) is not None
+            GLib.idle_add(_done, ok)
+
+        def _done(ok):
+            if ok:
+                self.uploads_paused = paused
+            else:
+                logger.error("Failed to change upload limit")
+            callback(ok)
+            return False
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _apply_limits(self, cmd, env):
+        """
+        Wraps the mount command with the configured resource limits. GOMEMLIMIT
+        makes rclone's Go runtime collect before the ceiling; a transient
+        systemd user scope adds a cgroup for MemoryHigh (which also covers page
+        cache) and CPU/IO weights. Without systemd-run (e.g. in Flatpak) only
+        GOMEMLIMIT applies.
+        """
+        settings = self.get_settings()
+        memory_mb = settings.get("memory_limit_mb")
+        properties = []
+        if memory_mb:
+            # Leave headroom for non-heap memory below the cgroup limit
+            env["GOMEMLIMIT"] = f"{int(memory_mb * 0.9)}MiB"
+            properties.append(f"MemoryHigh={int(memory_mb)}M")
+        if settings.get("cpu_weight"):
+            properties.append(f"CPUWeight={int(settings['cpu_weight'])}")
+        if settings.get("io_weight"):
+            properties.append(f"IOWeight={int(settings['io_weight'])}")
+
+        if not properties:
+            return cmd
+        systemd_run = shutil.which("systemd-run")
+        if not systemd_run:
+            logger.warning("systemd-run not found, cgroup limits not applied")
+            return cmd
+        if not systemd_user_manager_available():
+            logger.warning("systemd user manager not reachable, cgroup limits not applied")
+            return cmd
+
+        # --scope execs rclone in place, so Popen's pid is still rclone's
+        wrapper = [systemd_run, "--user", "--scope", "--quiet", "--collect",
+                   "--unit", f"protondrive-mount-{os.getpid()}-{int(time.time())}"]
+        for prop in properties:
+            wrapper.extend(["-p", prop])
+        return wrapper + ["--"] + cmd
+
     def start_mount(self, callback):
         """Starts rclone mount in the background."""
         if hasattr(self, 'mount_process') and self.mount_process and self.mount_process.poll() is None:
@@ -250,8 +725,12 @@ class ProtonDriveController(GObject.Object):
             "--allow-non-empty",
             "-v" # Verbose logging
         ]
+        rc_args, env = self._setup_rc()
+        cmd.extend(rc_args)
 
         try:
+            cmd = self._apply_limits(cmd, env)
+
             # We use Popen to keep it running
             # Check if fusermount3 or fusermount is available (rclone needs one)
             if not shutil.which("fusermount3") and not shutil.which("fusermount"):
@@ -265,8 +744,10 @@ class ProtonDriveController(GObject.Object):
                 stderr=subprocess.PIPE,
                 text=True,
                 bufsize=1, # Line buffered
-                universal_newlines=True
+                universal_newlines=True,
+                env=env
             )
+            self.uploads_paused = False
             
             # Start a thread to read stderr for logs
             import threading
@@ -279,8 +760,18 @@ class ProtonDriveController(GObject.Object):
             self.log_thread = threading.Thread(target=log_reader, daemon=True)
             self.log_thread.start()
 
+            self.stats_stop.clear()
+            self.stats_thread = threading.Thread(target=self._stats_poller, daemon=True)
+            self.stats_thread.start()
+
             # Start a monitoring loop for exit check
             GLib.timeout_add(1000, self._monitor_mount, callback)
+            # Poll quickly until the FUSE mount is actually visible
+            self._mount_wait_started = GLib.get_monotonic_time()
+            self.mount_starts += 1
+            self.time_to_mount = None
+            self.mount_waiting_ready = True
+            GLib.timeout_add(50, self._wait_mount_ready, mount_point)
             
             # success (tentative) - we don't know if it fully worked until we check later, 
             # but for UI responsiveness we say "Mounting..." or "Mounted"
@@ -306,6 +797,8 @@ class ProtonDriveController(GObject.Object):
             
             self.is_connected = False
             self.mount_process = None
+            self.stats_stop.set()
+            self.mount_unexpected_exits += 1
             
             # Notify failure via signal
             # We assume the log reader has captured the error output already.
@@ -314,10 +807,36 @@ class ProtonDriveController(GObject.Object):
             
         return True # Continue monitoring
 
+    def _wait_mount_ready(self, mount_point):
+        """Emits 'mount-ready' once the mount point is live. Gives up after 60s or on exit."""
+        if not self.is_mounted():
+            self.mount_waiting_ready = False
+            return False
+        if os.path.ismount(mount_point):
+            self.mount_waiting_ready = False
+            self.time_to_mount = (GLib.get_monotonic_time() - self._mount_wait_started) / 1000000
+            self.emit('mount-ready', mount_point)
+            return False
+        if GLib.get_monotonic_time() - self._mount_wait_started < 60 * 1000000:
+            return True
+        # Never went live; let quota refreshes go through rc or 'rclone about' again
+        logger.warning(f"{mount_point} did not become a mount point within 60s")
+        self.mount_waiting_ready = False
+        return False
+
+    def is_mount_ready(self):
+        """True once the running mount's FUSE mount point went live."""
+        return self.is_mounted() and self.time_to_mount is not None
+
+    def is_mounted(self):
+        """True while the rclone mount process is running."""
+        return bool(getattr(self, 'mount_process', None)) and self.mount_process.poll() is None
+
     def stop_mount(self, callback=None):
         """Stops the rclone mount process."""
         if hasattr(self, 'mount_process') and self.mount_process:
             logger.info("Stopping mount...")
+            self.stats_stop.set()
             # Try to terminate gracefully
             self.mount_process.terminate()
             try:
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+import threading
+import logging
+from collections import deque
+
+from gi.repository import GLib
+
+logger = logging.getLogger("ProtonDriveLatency")
+
+LATENCY_ENV = "PROTONDRIVE_LATENCY"
+DEFAULT_THRESHOLD_MS = 100
+
+# Upper bounds (ms) of the dispatch latency histogram, the last bucket is +Inf
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def describe_stack(frame):
+    """
+    Summarises the app frames on a stack as "handler > ... > file:line func".
+    Entry frames (module level, main()) are dropped, they are always there.
+    """
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        if os.path.dirname(os.path.abspath(code.co_filename)) == SRC_DIR \
+                and code.co_filename != __file__:
+            frames.append((code.co_name, os.path.basename(code.co_filename), frame.f_lineno))
+        frame = frame.f_back
+    frames.reverse()
+    frames = [f for f in frames if f[0] not in ("<module>", "main")]
+    if not frames:
+        return "(GTK/C code)"
+
+    names = [name for name, _, _ in frames]
+    if len(names) > 4:
+        names = names[:2] + ["..."] + names[-2:]
+    name, filename, lineno = frames[-1]
+    return " > ".join(names[:-1] + [f"{filename}:{lineno} {name}"])
+
+class MainLoopMonitor:
+    """
+    Measures GTK main loop dispatch latency and names the code that blocks it.
+
+    A heartbeat timer on the main loop records how late each tick fires into a
+    histogram. A watchdog thread notices when the heartbeat stops for longer
+    than the threshold and samples the main thread's Python stack, so the
+    stall is reported with the handler that was running.
+
+    Enabled with PROTONDRIVE_LATENCY=1 (100 ms threshold) or
+    PROTONDRIVE_LATENCY=<ms>.
+    """
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, interval_ms=50):
+        self.threshold = threshold_ms / 1000.0
+        self.interval_ms = interval_ms
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.max_ms = 0.0
+        self.stalls = deque(maxlen=50)
+        self.listeners = []
+
+        self.main_ident = threading.main_thread().ident
+        self.last_beat = time.monotonic()
+        self.stall_where = None
+
+    @classmethod
+    def from_env(cls):
+        value = os.environ.get(LATENCY_ENV, "")
+        if not value or value == "0":
+            return None
+        if value in ("1", "true", "yes"):
+            return cls()
+        try:
+            return cls(threshold_ms=float(value))
+        except ValueError:
+            logger.error(f"Invalid {LATENCY_ENV}={value}, using {DEFAULT_THRESHOLD_MS} ms")
+            return cls()
+
+    def start(self):
+        self.last_beat = time.monotonic()
+        GLib.timeout_add(self.interval_ms, self._beat)
+        threading.Thread(target=self._watchdog, daemon=True).start()
+
+    def connect(self, callback):
+        """callback(where, duration_ms) runs on the main loop after each stall."""
+        self.listeners.append(callback)
+
+    def _beat(self):
+        now = time.monotonic()
+        late_ms = max(0.0, (now - self.last_beat) * 1000.0 - self.interval_ms)
+        # Only trust a sample taken during this gap
+        sample = self.stall_where
+        where = sample[1] if sample and sample[0] == self.last_beat else "(unsampled)"
+        self.stall_where = None
+        self.last_beat = now
+
+        for i, bound in enumerate(BUCKETS_MS):
+            if late_ms <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.max_ms = max(self.max_ms, late_ms)
+
+        if late_ms >= self.threshold * 1000.0:
+            self.stalls.append((time.time(), where, late_ms))
+            logger.warning(f"Main loop blocked for {late_ms:.0f} ms in {where}")
+            for callback in self.listeners:
+                callback(where, late_ms)
+        return True
+
+    def _watchdog(self):
+        sampled_beat = None
+        while True:
+            time.sleep(self.interval_ms / 2000.0)
+            beat = self.last_beat
+            if beat == sampled_beat or time.monotonic() - beat < self.threshold:
+                continue
+            # Heartbeat overdue: capture what the main thread is doing, once per stall
+            frame = sys._current_frames().get(self.main_ident)
+            self.stall_where = (beat, describe_stack(frame))
+            sampled_beat = beat
+
+    def histogram(self):
+        """Returns [(upper_bound_label, count)], cumulative like Prometheus buckets."""
+        rows = []
+        total = 0
+        for bound, count in zip(BUCKETS_MS + ("+Inf",), self.counts):
+            total += count
+            rows.append((f"{bound} ms" if bound != "+Inf" else bound, total))
+        return rows
+
+    def log_summary(self):
+        for line in self.summary().splitlines():
+            logger.info(line)
+
+    def summary(self):
+        lines = [f"Main loop latency (threshold {self.threshold * 1000:.0f} ms, max {self.max_ms:.0f} ms)"]
+        for label, count in self.histogram():
+            lines.append(f"  <= {label:>8}: {count}")
+        if self.stalls:
+            lines.append("Recent stalls:")
+            for timestamp, where, duration in list(self.stalls)[-10:]:
+                lines.append(f"  {time.strftime('%H:%M:%S', time.localtime(timestamp))} {duration:6.0f} ms  {where}")
+        return "\n".join(lines)
@@ -8,9 +8,19 @@ gi.require_version('Adw', '1')
 from gi.repository import Gtk, Adw, Gio, GLib
 
 from controller import ProtonDriveController
+from tracing import StartupTrace
+from latency import MainLoopMonitor
+import tray_protocol
+import sync
 import signal
 import subprocess
 import threading
+from collections import deque
+
+# Created at import so the trace covers interpreter and GTK startup
+trace = StartupTrace.from_env()
+# None unless PROTONDRIVE_LATENCY is set
+latency_monitor = MainLoopMonitor.from_env()
 
 class ProtonDriveWindow(Adw.ApplicationWindow):
     __gtype_name__ = 'ProtonDriveWindow'
@@ -20,67 +30,167 @@ class ProtonDriveWindow(Adw.ApplicationWindow):
         pass
 
 class ProtonDriveApp(Adw.Application):
+    # Minimum gap between tray messages; updates in between are coalesced
+    TRAY_MIN_INTERVAL_MS = 500
+    # How long an error from a running mount stays flagged in the tray
+    RECENT_ERROR_SECONDS = 60
+
     def __init__(self):
         super().__init__(application_id='org.example.protondrive',
                          flags=Gio.ApplicationFlags.FLAGS_NONE)
         self.controller = ProtonDriveController()
         self.tray_process = None
         self.tray_thread = None
+        self.tray_version = 1
+        self.tray_state = tray_protocol.default_state()
+        self.tray_sent_state = None
+        self.tray_last_sent = 0
+        self.tray_flush_id = 0
+        # core/stats only counts errors up, so track when the count last grew
+        self.mount_errors_seen = 0
+        self.recent_error_time = 0
+        self.builder = None
+        self.window = None
+        self.started = False
+        self.held = False
+        # Mount log lines received while the window is not built yet
+        self.pending_logs = deque(maxlen=500)
+
+        self.controller.connect('mount-error', self.on_mount_error)
+        self.controller.connect('mount-log', self.on_mount_log)
+        self.controller.connect('mount-ready', self.on_mount_ready)
+        self.controller.connect('mount-stats', self.on_mount_stats)
+        self.controller.connect('quota-changed', self.on_quota_changed)
+        self.controller.sync.connect('sync-status', self.on_sync_status)
+        # Folder path -> (row, button) in the synced folders list
+        self.sync_rows = {}
+
+    def do_startup(self):
+        Adw.Application.do_startup(self)
+        if latency_monitor:
+            latency_monitor.start()
+            latency_monitor.connect(self.on_main_loop_stall)
 
     def do_activate(self):
-        win = self.props.active_window
-        if not win:
-            self.builder = Gtk.Builder()
-            ui_path = os.path.join(os.path.dirname(__file__), 'interface.ui')
-            self.builder.add_from_file(ui_path)
-            
-            win = self.builder.get_object('ProtonDriveWindow')
-            win.set_application(self)
-            
-            # Setup Window Close Interception
-            win.connect('close-request', self.on_window_close_request)
+        trace.mark("activate", once=True)
+        if self.window:
+            self.window.present()
+            return
 
-            # Setup Tray
-            self.setup_system_tray()
+        if "--minimized" in sys.argv and not self.started:
+            self.start_minimized()
+            return
 
-            
-            self.connect_button = self.builder.get_object('connect_button')
-            self.status_label = self.builder.get_object('status_label')
-            self.mount_switch = self.builder.get_object('mount_switch')
-            self.autostart_switch = self.builder.get_object('autostart_switch')
-            self.quota_label = self.builder.get_object('quota_label')
-            self.quota_bar = self.builder.get_object('quota_bar')
-            self.user_label = self.builder.get_object('user_label')
-            
-            self.connect_button.connect('clicked', self.on_connect_clicked)
-            self.mount_switch.connect('notify::active', self.on_mount_toggled)
-            self.autostart_switch.connect('notify::active', self.on_autostart_toggled)
-            
-            self.controller.connect('mount-error', self.on_mount_error)
-            self.controller.connect('mount-log', self.on_mount_log)
-            
-            self.log_view = self.builder.get_object('log_view')
+        self.started = True
+        self.setup_system_tray()
+        self.build_window()
+        trace.mark("window-built", once=True)
+        self.window.present()
+
+    def start_minimized(self):
+        """Login-time path: mount first, build the window only when it is first shown."""
+        print("Starting minimized to tray...")
+        self.started = True
+        # No window holds the application yet
+        self.hold()
+        self.held = True
+
+        # Tray is a separate interpreter, spawn it now so it loads while we mount
+        self.setup_system_tray()
+        trace.mark("tray-spawned")
+
+        ok, msg = self.controller.check_installation()
+        if not ok:
+            print(f"Cannot auto-mount: {msg}")
+            return
 
-            # Initialize Autostart state
-            self.autostart_switch.set_active(self.controller.check_autostart())
-            
-            # Initial check
-            ok, msg = self.controller.check_installation()
-            if not ok:
-                self.status_label.set_label(f"Error: {msg}")
-                self.connect_button.set_sensitive(False)
-            else:
-                self.check_login_status()
-
-            # Handle Minimized Start
-            if "--minimized" in sys.argv:
-                print("Starting minimized to tray...")
-                # Auto-mount if configured
-                if self.controller.check_config():
-                    GLib.idle_add(lambda: self.mount_switch.set_active(True))
-                # Do not present window
-            else:
-                win.present()
+        # Auto-mount if configured
+        if self.controller.check_config():
+            trace.mark("config-checked")
+            self.send_tray_update(tray_protocol.MOUNTING)
+            self.controller.start_mount(self.on_mount_result)
+            trace.mark("mount-started")
+            self.controller.sync.start()
+
+    def build_window(self):
+        """Parses interface.ui and wires the main window. Safe to call once."""
+        self.builder = Gtk.Builder()
+        ui_path = os.path.join(os.path.dirname(__file__), 'interface.ui')
+        self.builder.add_from_file(ui_path)
+
+        win = self.builder.get_object('ProtonDriveWindow')
+        win.set_application(self)
+        self.window = win
+
+        # Setup Window Close Interception
+        win.connect('close-request', self.on_window_close_request)
+
+        self.connect_button = self.builder.get_object('connect_button')
+        self.status_label = self.builder.get_object('status_label')
+        self.mount_switch = self.builder.get_object('mount_switch')
+        self.autostart_switch = self.builder.get_object('autostart_switch')
+        self.quota_label = self.builder.get_object('quota_label')
+        self.quota_bar = self.builder.get_object('quota_bar')
+        self.user_label = self.builder.get_object('user_label')
+        self.resource_label = self.builder.get_object('resource_label')
+
+        self.connect_button.connect('clicked', self.on_connect_clicked)
+        self.mount_switch.connect('notify::active', self.on_mount_toggled)
+        self.autostart_switch.connect('notify::active', self.on_autostart_toggled)
+
+        self.log_view = self.builder.get_object('log_view')
+        self.sync_expander = self.builder.get_object('sync_expander')
+        self.sync_list = self.builder.get_object('sync_list')
+
+        if latency_monitor:
+            self.debug_expander = self.builder.get_object('debug_expander')
+            self.latency_label = self.builder.get_object('latency_label')
+            self.debug_expander.set_visible(True)
+            self.debug_expander.connect('notify::expanded', lambda *args: self.update_latency_panel())
+            GLib.timeout_add_seconds(2, self.update_latency_panel)
+
+        # Replay log lines received before the window existed
+        buffer = self.log_view.get_buffer()
+        for line in self.pending_logs:
+            buffer.insert(buffer.get_end_iter(), line)
+        self.pending_logs.clear()
+
+        # Initialize Autostart state
+        self.autostart_switch.set_active(self.controller.check_autostart())
+
+        # Initial check
+        ok, msg = self.controller.check_installation()
+        if not ok:
+            self.status_label.set_label(f"Error: {msg}")
+            self.connect_button.set_sensitive(False)
+        else:
+            self.check_login_status()
+
+        # Reflect a mount started before the window was built
+        if self.controller.is_mounted():
+            self.set_mount_switch(True)
+            self.status_label.set_label("Status: Mounted successfully")
+
+        # The window now keeps the application alive
+        if self.held:
+            self.release()
+            self.held = False
+
+    def on_main_loop_stall(self, where, duration_ms):
+        if self.window:
+            self.update_latency_panel()
+
+    def update_latency_panel(self):
+        """Refreshes the debug panel while it is expanded. Also the 2s timer callback."""
+        if self.debug_expander.get_expanded():
+            self.latency_label.set_label(latency_monitor.summary())
+        return True
+
+    def set_mount_switch(self, active):
+        """Moves the mount switch without triggering on_mount_toggled."""
+        self.mount_switch.handler_block_by_func(self.on_mount_toggled)
+        self.mount_switch.set_active(active)
+        self.mount_switch.handler_unblock_by_func(self.on_mount_toggled)
 
     def check_login_status(self):
         if self.controller.check_config():
@@ -97,6 +207,10 @@ class ProtonDriveApp(Adw.Application):
             
             # Update Quota
             GLib.idle_add(self.update_quota_ui)
+
+            self.controller.sync.start()
+            for folder in self.controller.sync.folders:
+                self.on_sync_status(self.controller.sync, folder.status())
             
             # Update User Label
             username = self.controller.get_current_user()
@@ -110,6 +224,8 @@ class ProtonDriveApp(Adw.Application):
             self.mount_switch.set_sensitive(False)
             self.mount_switch.set_active(False)
             self.user_label.set_visible(False)
+            self.show_quota(None, None)
+            self.clear_sync_rows()
             # Reset button state
             self.connect_button.set_label("Connect Account")
             self.connect_button.remove_css_class("destructive-action")
@@ -119,7 +235,10 @@ class ProtonDriveApp(Adw.Application):
             self.connect_button.connect('clicked', self.on_connect_clicked)
 
     def setup_system_tray(self):
-        """Launches the tray helper process."""
+        """Launches the tray helper process, unless one is already running."""
+        if self.tray_process and self.tray_process.poll() is None:
+            return
+
         tray_script = os.path.join(os.path.dirname(__file__), 'tray.py')
         try:
             self.tray_process = subprocess.Popen(
@@ -144,13 +263,23 @@ class ProtonDriveApp(Adw.Application):
             line = self.tray_process.stdout.readline()
             if not line: break
             
-            line = line.strip()
+            kind, payload = tray_protocol.parse_line(line)
             
-            if line == "ACTION:SHOW":
+            if kind == "HELLO":
+                GLib.idle_add(self.on_tray_hello, payload)
+            elif kind != "ACTION":
+                continue
+            elif payload == "SHOW":
                 GLib.idle_add(self.on_tray_show)
-            elif line == "ACTION:TOGGLE":
+            elif payload == "TOGGLE":
                 GLib.idle_add(self.on_tray_toggle)
-            elif line == "ACTION:QUIT":
+            elif payload == "OPEN":
+                GLib.idle_add(self.on_tray_open)
+            elif payload == "PAUSE":
+                GLib.idle_add(self.on_tray_pause, True)
+            elif payload == "RESUME":
+                GLib.idle_add(self.on_tray_pause, False)
+            elif payload == "QUIT":
                 GLib.idle_add(self.quit)
 
     def on_window_close_request(self, win):
@@ -164,26 +293,93 @@ class ProtonDriveApp(Adw.Application):
         return True
 
     def on_tray_show(self):
-        win = self.props.active_window
-        if win:
-            win.set_visible(True)
-            win.present()
+        if not self.window:
+            self.build_window()
+            trace.mark("window-built", once=True)
+        self.window.set_visible(True)
+        self.window.present()
 
     def on_tray_toggle(self):
-        if hasattr(self, 'mount_switch'):
+        if self.window:
              active = self.mount_switch.get_active()
              self.mount_switch.set_active(not active)
+        elif self.controller.is_mounted():
+             self.controller.stop_mount(self.on_mount_result)
+             self.send_tray_update(tray_protocol.UNMOUNTING)
+        elif self.controller.check_config():
+             self.controller.start_mount(self.on_mount_result)
+             self.send_tray_update(tray_protocol.MOUNTING)
              
-    def send_tray_update(self, status):
-        """Sends status to tray process."""
-        if self.tray_process and self.tray_process.poll() is None:
-            try:
-                self.tray_process.stdin.write(f"STATUS:{status}\n")
-                self.tray_process.stdin.flush()
-            except BrokenPipeError:
-                pass
+    def on_tray_hello(self, version):
+        self.tray_version = version
+        # Resend everything in the format the tray understands
+        self.tray_sent_state = None
+        self.schedule_tray_flush()
+
+    def on_tray_open(self):
+        uri = GLib.filename_to_uri(self.controller.get_mount_path(), None)
+        try:
+            Gio.AppInfo.launch_default_for_uri(uri, None)
+        except GLib.Error as e:
+            print(f"Failed to open mount: {e}")
+
+    def on_tray_pause(self, paused):
+        def on_done(success):
+            if success:
+                self.update_tray_state(paused=paused)
+        self.controller.set_uploads_paused(paused, on_done)
+
+    def send_tray_update(self, status, error=None):
+        """Records a mount state change for the tray."""
+        fields = {"mount": status, "error": error}
+        if status != tray_protocol.MOUNTED:
+            fields.update(speed=0, pending=0)
+        if status == tray_protocol.DISCONNECTED:
+            fields["paused"] = False
+        if status == tray_protocol.MOUNTING:
+            # A new rclone process starts counting errors from zero
+            self.mount_errors_seen = 0
+            self.recent_error_time = 0
+            fields["errors"] = 0
+        self.update_tray_state(**fields)
+
+    def update_tray_state(self, **fields):
+        self.tray_state.update(fields)
+        self.schedule_tray_flush()
+
+    def schedule_tray_flush(self):
+        """Sends the latest tray state at most once per TRAY_MIN_INTERVAL_MS."""
+        if self.tray_flush_id:
+            return
+        elapsed_ms = (GLib.get_monotonic_time() - self.tray_last_sent) // 1000
+        delay = max(0, self.TRAY_MIN_INTERVAL_MS - elapsed_ms)
+        self.tray_flush_id = GLib.timeout_add(delay, self.flush_tray_state)
+
+    def flush_tray_state(self):
+        self.tray_flush_id = 0
+        if self.tray_state == self.tray_sent_state:
+            return False
+        if not self.tray_process or self.tray_process.poll() is not None:
+            return False
+
+        if self.tray_version >= 2:
+            line = tray_protocol.encode_state(self.tray_state)
+        else:
+            line = tray_protocol.encode_status(self.tray_state)
+        try:
+            self.tray_process.stdin.write(line)
+            self.tray_process.stdin.flush()
+        except BrokenPipeError:
+            return False
+
+        self.tray_sent_state = dict(self.tray_state)
+        self.tray_last_sent = GLib.get_monotonic_time()
+        return False
 
     def do_shutdown(self):
+        if latency_monitor:
+            latency_monitor.log_summary()
+
         if self.tray_process:
             try:
                 self.tray_process.stdin.write("QUIT\n")
@@ -199,31 +395,84 @@ class ProtonDriveApp(Adw.Application):
             self.status_label.set_label("Mounting...")
             switch.set_sensitive(False) # Prevent toggling while processing
             self.controller.start_mount(self.on_mount_result)
-            self.send_tray_update("MOUNTING")
+            self.send_tray_update(tray_protocol.MOUNTING)
         else:
             self.status_label.set_label("Unmounting...")
             switch.set_sensitive(False)
             self.controller.stop_mount(self.on_mount_result)
-            self.send_tray_update("UNMOUNTING")
+            self.send_tray_update(tray_protocol.UNMOUNTING)
 
     def on_mount_result(self, success, message):
+        if not self.window:
+            # Minimized start, the window syncs from the controller when built
+            if not success:
+                print(f"Auto-mount failed: {message}")
+                self.send_tray_update(tray_protocol.ERROR, message)
+            elif "unmounted" in message.lower():
+                self.send_tray_update(tray_protocol.DISCONNECTED)
+            elif self.controller.is_mount_ready():
+                self.send_tray_update(tray_protocol.MOUNTED)
+            return
+
         self.mount_switch.set_sensitive(True)
         self.status_label.set_label(f"Status: {message}")
         if not success:
             # Revert switch if failed
-            # Block signal to prevent loop
-            self.mount_switch.handler_block_by_func(self.on_mount_toggled)
-            self.mount_switch.set_active(not self.mount_switch.get_active())
-            self.mount_switch.handler_unblock_by_func(self.on_mount_toggled)
-            self.send_tray_update("DISCONNECTED")
+            self.set_mount_switch(not self.mount_switch.get_active())
+            self.send_tray_update(tray_protocol.ERROR, message)
         else:
              if "unmounted" in message.lower():
-                 self.send_tray_update("DISCONNECTED")
-             else:
-                 self.send_tray_update("MOUNTED")
-                 self.update_quota_ui()
+                 self.send_tray_update(tray_protocol.DISCONNECTED)
+                 self.show_resource_usage(None)
+             elif self.controller.is_mount_ready():
+                 # e.g. "Already mounted."; otherwise the tray stays
+                 # MOUNTING until 'mount-ready'
+                 self.send_tray_update(tray_protocol.MOUNTED)
+
+    def on_mount_ready(self, controller, mount_point):
+        trace.mark("mounted", once=True)
+        self.send_tray_update(tray_protocol.MOUNTED)
+        # rc answers by now, so a stale quota is fetched from the live mount
+        self.controller.refresh_quota()
+
+    def on_mount_stats(self, controller, stats):
+        fields = {
+            "speed": stats["speed"],
+            "pending": stats["pending"],
+            "paused": stats["paused"],
+            "errors": stats["errors"],
+        }
+        # lastError sticks until rclone restarts, so only flag it while new
+        now = GLib.get_monotonic_time()
+        if stats["errors"] > self.mount_errors_seen:
+            self.mount_errors_seen = stats["errors"]
+            self.recent_error_time = now
+            fields["error"] = stats["last_error"] or f"{stats['errors']} errors"
+        elif self.recent_error_time and now - self.recent_error_time > self.RECENT_ERROR_SECONDS * 1000000:
+            self.recent_error_time = 0
+            fields["error"] = None
+        self.update_tray_state(**fields)
+        if self.window and self.controller.is_mounted():
+            self.show_resource_usage(stats)
+
+    def show_resource_usage(self, stats):
+        if stats is None or stats.get("rss") is None:
+            self.resource_label.set_visible(False)
+            return
+
+        text = f"rclone: {stats['rss'] / (1024 * 1024):.0f} MB RSS"
+        if stats.get("cpu") is not None:
+            text += f", {stats['cpu']:.0f}% CPU"
+        if stats.get("throttled"):
+            text += " (memory throttled)"
+        self.resource_label.set_label(text)
+        self.resource_label.set_visible(True)
 
     def on_mount_log(self, controller, message):
+        if not self.window:
+            self.pending_logs.append(message)
+            return
+
         buffer = self.log_view.get_buffer()
         end_iter = buffer.get_end_iter()
         buffer.insert(end_iter, message)
@@ -234,21 +483,26 @@ class ProtonDriveApp(Adw.Application):
              adj.set_value(adj.get_upper() - adj.get_page_size())
 
     def on_mount_error(self, controller, message):
+        self.send_tray_update(tray_protocol.ERROR, message)
+        if not self.window:
+            print(f"Mount error: {message}")
+            return
+
         self.status_label.set_label(f"Error: {message}")
         try:
             self.status_label.add_css_class("error")
         except: pass # GtkLabel might not support add_css_class directly in some bindings if not widget? No, it's fine.
         
+        self.show_resource_usage(None)
+
         # Reset switch without triggering toggle logic again (block handlers)
-        self.mount_switch.handler_block_by_func(self.on_mount_toggled)
-        self.mount_switch.set_active(False)
-        self.mount_switch.handler_unblock_by_func(self.on_mount_toggled)
+        self.set_mount_switch(False)
         self.mount_switch.set_sensitive(True)
 
     def on_connect_clicked(self, button):
         # Open Login Dialog
         self.login_window = self.builder.get_object('LoginWindow')
-        self.login_window.set_transient_for(self.props.active_window)
+        self.login_window.set_transient_for(self.window)
         
         self.username_entry = self.builder.get_object('username_entry')
         self.password_entry = self.builder.get_object('password_entry')
@@ -269,12 +523,21 @@ class ProtonDriveApp(Adw.Application):
         if self.controller.delete_config():
             self.check_login_status()
             self.status_label.set_label("Disconnected")
-            self.send_tray_update("DISCONNECTED")
+            self.send_tray_update(tray_protocol.DISCONNECTED)
         else:
              self.status_label.set_label("Error disconnecting")
 
     def update_quota_ui(self):
-        used, total = self.controller.get_quota()
+        """Shows the cached quota right away and revalidates it in the background."""
+        used, total, age = self.controller.get_cached_quota()
+        self.show_quota(used, total)
+        self.controller.refresh_quota()
+
+    def on_quota_changed(self, controller, used, total):
+        if self.window:
+            self.show_quota(used, total)
+
+    def show_quota(self, used, total):
         if used is None or total is None or total == 0:
              self.quota_label.set_label("Storage Usage: Unknown")
              self.quota_bar.set_value(0)
@@ -294,6 +557,53 @@ class ProtonDriveApp(Adw.Application):
         self.quota_label.set_label(f"Storage Usage: {usage_str}")
         self.quota_bar.set_value(used / total)
 
+    def on_sync_status(self, manager, status):
+        if not self.window:
+            return
+
+        local = status["local"]
+        if local not in self.sync_rows:
+            title = f"{os.path.basename(local) or local} \u2194 Proton:/{status['remote']}"
+            row = Adw.ActionRow(title=GLib.markup_escape_text(title))
+            button = Gtk.Button(valign=Gtk.Align.CENTER)
+            button.connect('clicked', self.on_sync_now_clicked, local)
+            row.add_suffix(button)
+            self.sync_list.append(row)
+            self.sync_rows[local] = (row, button)
+            self.sync_expander.set_visible(True)
+        row, button = self.sync_rows[local]
+
+        state = status["state"]
+        if state == sync.SYNCING:
+            subtitle = "Syncing..."
+        elif state in (sync.ERROR, sync.NEEDS_RESYNC):
+            subtitle = f"Error: {status['last_error']}"
+        elif status["last_sync"]:
+            subtitle = "Synced " + GLib.DateTime.new_from_unix_local(int(status["last_sync"])).format("%x %X")
+        else:
+            subtitle = "Not synced yet"
+        if status["conflicts"]:
+            subtitle += f" ({status['conflicts']} conflicts kept as copies)"
+        row.set_subtitle(GLib.markup_escape_text(subtitle))
+
+        button.set_label("Resync" if state == sync.NEEDS_RESYNC else "Sync Now")
+        button.set_sensitive(state != sync.SYNCING)
+
+    def on_sync_now_clicked(self, button, local):
+        folder = self.controller.sync.get_folder(local)
+        if not folder:
+            return
+        if folder.state == sync.NEEDS_RESYNC:
+            self.controller.sync.resync(folder)
+        else:
+            self.controller.sync.sync_folder(folder)
+
+    def clear_sync_rows(self):
+        for row, _ in self.sync_rows.values():
+            self.sync_list.remove(row)
+        self.sync_rows.clear()
+        self.sync_expander.set_visible(False)
+
     def on_autostart_toggled(self, switch, gparam):
         self.controller.set_autostart(switch.get_active())
 
@@ -333,6 +643,7 @@ class ProtonDriveApp(Adw.Application):
             self.login_status_label.set_visible(True)
 
 def main():
+    trace.mark("main")
     app = ProtonDriveApp()
     return app.run(sys.argv)
 
@@ -0,0 +1,167 @@
+import os
+import re
+import time
+import threading
+import logging
+
+import sync
+
+logger = logging.getLogger("ProtonDriveMetrics")
+
+# Proton API error code, else an HTTP status, in an rclone ERROR log line
+API_CODE_RE = re.compile(r"\bCode=(\d+)")
+HTTP_STATUS_RE = re.compile(r"\b([45]\d\d) [A-Z][a-z]")
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def filter_rclone_metrics(text):
+    """
+    Keeps only rclone_* series (and their HELP/TYPE lines) from rclone's
+    /metrics output. Its go_* and process_* series would clash with the ones
+    node_exporter reports about itself.
+    """
+    keep = []
+    for line in text.splitlines():
+        if line.startswith("# "):
+            parts = line.split(" ", 3)
+            if len(parts) > 2 and parts[2].startswith("rclone_"):
+                keep.append(line)
+        elif line.startswith("rclone_"):
+            keep.append(line)
+    return keep
+
+class MetricsExporter:
+    """
+    Periodically writes mount health in Prometheus text format, for the
+    node_exporter textfile collector or anything else that scrapes files.
+
+    Everything is fed by signals the controller already emits (stats are
+    polled once a second for the tray anyway), so the only extra work per
+    interval is one loopback request for rclone's own metrics and a file
+    write, both on a background thread.
+    """
+
+    def __init__(self, controller):
+        self.controller = controller
+        settings = controller.get_settings()
+        self.path = os.path.expanduser(settings["metrics_file"])
+        # Checked in _load_settings, anything else already fell back to None
+        self.interval = int(settings.get("metrics_interval") or 15)
+
+        self.stats = {}
+        self.api_errors = {}
+        self.stop_event = threading.Event()
+
+        # render() runs on the exporter thread and must not touch the
+        # controller's caches, so quota is snapshotted here on the main loop
+        used, total, age = controller.get_cached_quota()
+        self.quota = (used, total, None if age is None else time.time() - age)
+
+        controller.connect('mount-stats', self.on_mount_stats)
+        controller.connect('mount-log', self.on_mount_log)
+        controller.connect('quota-changed', self.on_quota_changed)
+
+    def start(self):
+        # The mount asks for rc metrics by version; have it ready by then
+        self.controller.preload_rclone_version()
+        thread = threading.Thread(target=self._run, daemon=True)
+        thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def on_mount_stats(self, controller, stats):
+        self.stats = stats
+
+    def on_quota_changed(self, controller, used, total):
+        self.quota = (used, total, time.time())
+
+    def on_mount_log(self, controller, line):
+        if "ERROR" not in line:
+            return
+        match = API_CODE_RE.search(line) or HTTP_STATUS_RE.search(line)
+        code = match.group(1) if match else "unknown"
+        self.api_errors[code] = self.api_errors.get(code, 0) + 1
+
+    def _run(self):
+        while True:
+            try:
+                self.write()
+            except Exception as e:
+                logger.error(f"Failed to write metrics: {e}")
+            if self.stop_event.wait(self.interval):
+                break
+
+    def render(self):
+        controller = self.controller
+        mounted = controller.is_mounted()
+        # Stats are only meaningful for the current mount
+        stats = self.stats if mounted else {}
+        used, total, quota_time = self.quota
+        quota_age = None if quota_time is None else max(0, time.time() - quota_time)
+
+        lines = []
+        def metric(name, mtype, help_text, value, labels=None):
+            if value is None:
+                return
+            if not any(line.startswith(f"# TYPE {name} ") for line in lines):
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {mtype}")
+            label_str = ""
+            if labels:
+                label_str = "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in labels.items()) + "}"
+            lines.append(f"{name}{label_str} {value}")
+
+        metric("protondrive_mount_up", "gauge", "Whether the rclone mount process is running.", int(mounted))
+        metric("protondrive_mount_restarts_total", "counter", "Mount starts after the first one in this session.",
+               max(0, controller.mount_starts - 1))
+        metric("protondrive_mount_unexpected_exits_total", "counter", "Mount processes that exited on their own.",
+               controller.mount_unexpected_exits)
+        metric("protondrive_time_to_mount_seconds", "gauge", "Seconds from starting rclone to the mount point being live.",
+               controller.time_to_mount)
+        metric("protondrive_transfer_speed_bytes_per_second", "gauge", "Current transfer rate in bytes per second.",
+               stats.get("speed"))
+        metric("protondrive_transferred_bytes_total", "counter", "Bytes transferred by the current mount.",
+               stats.get("bytes"))
+        metric("protondrive_pending_uploads", "gauge", "Uploads queued or in progress.", stats.get("pending"))
+        metric("protondrive_vfs_cache_bytes", "gauge", "Bytes used by the VFS disk cache.", stats.get("cache_bytes"))
+        metric("protondrive_rclone_rss_bytes", "gauge", "Resident memory of the rclone process.", stats.get("rss"))
+        metric("protondrive_rclone_cpu_percent", "gauge", "CPU usage of the rclone process.",
+               None if stats.get("cpu") is None else round(stats["cpu"], 1))
+        metric("protondrive_quota_used_bytes", "gauge", "Used storage from the quota cache.", used)
+        metric("protondrive_quota_total_bytes", "gauge", "Total storage from the quota cache.", total)
+        metric("protondrive_quota_age_seconds", "gauge", "Age of the cached quota.",
+               None if quota_age is None else int(quota_age))
+        # Copy first, the main loop keeps counting while we render
+        for code, count in sorted(self.api_errors.copy().items()):
+            metric("protondrive_api_errors_total", "counter", "ERROR lines in the mount log by API or HTTP code.",
+                   count, {"code": code})
+
+        # Samples of one family must stay together, so loop per family
+        folders = list(controller.sync.folders)
+        for folder in folders:
+            metric("protondrive_sync_ok", "gauge", "Whether the last bisync of a synced folder succeeded.",
+                   int(folder.state not in (sync.ERROR, sync.NEEDS_RESYNC)), {"folder": folder.local})
+        for folder in folders:
+            metric("protondrive_sync_last_success_timestamp_seconds", "gauge", "Unix time of the last successful bisync.",
+                   None if folder.last_sync is None else int(folder.last_sync), {"folder": folder.local})
+        for folder in folders:
+            metric("protondrive_sync_conflicts", "gauge", "Conflicts found by the last bisync.",
+                   folder.conflicts, {"folder": folder.local})
+
+        if mounted:
+            rclone_text = controller.rc_get_metrics()
+            if rclone_text:
+                lines.extend(filter_rclone_metrics(rclone_text))
+
+        return "\n".join(lines) + "\n"
+
+    def write(self):
+        """Writes atomically so a scraper never sees a partial file."""
+        text = self.render()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,300 @@
+import os
+import json
+import time
+import threading
+import subprocess
+import logging
+from gi.repository import GLib, GObject, Gio
+
+logger = logging.getLogger("ProtonDriveSync")
+
+SYNC_STATE_FILE = os.path.expanduser("~/.cache/protondrive-gui/sync-state.json")
+
+# Folder states reported in 'sync-status'
+IDLE = "idle"
+SYNCING = "syncing"
+ERROR = "error"
+NEEDS_RESYNC = "needs-resync"
+
+# Seconds of quiet after a local change before syncing
+DEBOUNCE_SECONDS = 10
+# inotify watches are per directory; past this only the schedule applies
+MAX_WATCHED_DIRS = 1000
+
+class SyncFolder:
+    """One local folder kept in two-way sync with a path on the remote."""
+
+    def __init__(self, local, remote, interval):
+        self.local = os.path.expanduser(local)
+        self.remote = remote.strip("/")
+        self.interval = interval
+
+        self.state = IDLE
+        self.last_sync = None
+        self.last_error = None
+        self.conflicts = 0
+        self.initialized = False
+
+        self.running = False
+        self.process = None
+        self.rerun = False
+        self.force_resync = False
+        self.timer_id = 0
+        self.debounce_id = 0
+        self.monitors = {}
+
+    def status(self):
+        return {
+            "local": self.local,
+            "remote": self.remote,
+            "state": self.state,
+            "last_sync": self.last_sync,
+            "last_error": self.last_error,
+            "conflicts": self.conflicts,
+        }
+
+class SyncManager(GObject.Object):
+    """
+    Runs rclone bisync for the folders listed under "sync_folders" in
+    settings.json, as an offline-friendly alternative to the FUSE mount.
+
+    Each folder syncs on its own schedule and after local changes (inotify
+    via Gio.FileMonitor, debounced). Only one bisync runs per folder; a
+    request that arrives meanwhile is folded into a single rerun.
+    """
+
+    __gsignals__ = {
+        'sync-status': (GObject.SignalFlags.RUN_LAST, None, (object,))
+    }
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+        self.folders = []
+        self.started = False
+
+    def load_folders(self):
+        settings = self.controller.get_settings()
+        default_interval = int(settings.get("sync_interval") or 900)
+        saved = self._load_state()
+
+        folders = []
+        for entry in settings.get("sync_folders") or []:
+            try:
+                interval = entry.get("interval", default_interval)
+                # Same rule as sync_interval; GLib rejects anything below 1
+                if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval < 1:
+                    raise ValueError(f"interval must be a number of seconds, at least 1, not {interval!r}")
+                # A missing remote must not default to the drive root
+                folder = SyncFolder(entry["local"], entry["remote"], int(interval))
+            except (KeyError, TypeError, ValueError, AttributeError) as e:
+                logger.error(f"Invalid sync folder entry {entry}: {e}")
+                continue
+            state = saved.get(self._key(folder), {})
+            folder.initialized = state.get("initialized", False)
+            folder.last_sync = state.get("last_sync")
+            folders.append(folder)
+        return folders
+
+    def start(self):
+        """Starts scheduled and change-triggered syncing. Safe to call repeatedly."""
+        if self.started:
+            return
+        self.started = True
+        self.folders = self.load_folders()
+
+        for folder in list(self.folders):
+            try:
+                os.makedirs(folder.local, exist_ok=True)
+            except OSError as e:
+                logger.error(f"Cannot create sync folder {folder.local}, skipping it: {e}")
+                self.folders.remove(folder)
+                continue
+            self._watch_tree(folder, folder.local)
+            folder.timer_id = GLib.timeout_add_seconds(folder.interval, self._on_timer, folder)
+            self.sync_folder(folder)
+
+    def stop(self):
+        for folder in self.folders:
+            for monitor in folder.monitors.values():
+                monitor.cancel()
+            folder.monitors.clear()
+            for source_id in (folder.timer_id, folder.debounce_id):
+                if source_id:
+                    GLib.source_remove(source_id)
+            folder.timer_id = folder.debounce_id = 0
+            # Its result would otherwise land after the folder list is gone
+            if folder.process and folder.process.poll() is None:
+                logger.info(f"Stopping sync of {folder.local}")
+                folder.process.terminate()
+        self.folders = []
+        self.started = False
+
+    def get_folder(self, local):
+        for folder in self.folders:
+            if folder.local == local:
+                return folder
+        return None
+
+    def _key(self, folder):
+        return f"{folder.local}|{folder.remote}"
+
+    def _load_state(self):
+        try:
+            with open(SYNC_STATE_FILE, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def _save_state(self):
+        state = {
+            self._key(folder): {"initialized": folder.initialized, "last_sync": folder.last_sync}
+            for folder in self.folders
+        }
+        try:
+            os.makedirs(os.path.dirname(SYNC_STATE_FILE), exist_ok=True)
+            with open(SYNC_STATE_FILE, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            logger.error(f"Failed to save sync state: {e}")
+
+    def _watch_tree(self, folder, path):
+        """Adds a directory monitor for path and every directory below it."""
+        for root, dirs, _ in os.walk(path):
+            if len(folder.monitors) >= MAX_WATCHED_DIRS:
+                logger.warning(f"Not watching more than {MAX_WATCHED_DIRS} directories in {folder.local}")
+                return
+            if root in folder.monitors:
+                continue
+            try:
+                monitor = Gio.File.new_for_path(root).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+            except GLib.Error as e:
+                logger.warning(f"Cannot watch {root}: {e}")
+                continue
+            monitor.connect('changed', self._on_local_change, folder)
+            folder.monitors[root] = monitor
+
+    def _on_local_change(self, monitor, file, other_file, event, folder):
+        if event in (Gio.FileMonitorEvent.ATTRIBUTE_CHANGED, Gio.FileMonitorEvent.CHANGES_DONE_HINT):
+            return
+
+        # Keep directory monitors in step with the tree
+        path = file.get_path()
+        new_path = other_file.get_path() if other_file else None
+        if event in (Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_OUT,
+                     Gio.FileMonitorEvent.RENAMED) and path:
+            # The whole subtree went with it
+            for watched in [p for p in folder.monitors if p == path or p.startswith(path + os.sep)]:
+                folder.monitors.pop(watched).cancel()
+        if event in (Gio.FileMonitorEvent.CREATED, Gio.FileMonitorEvent.MOVED_IN) and path and os.path.isdir(path):
+            self._watch_tree(folder, path)
+        elif event == Gio.FileMonitorEvent.RENAMED and new_path and os.path.isdir(new_path):
+            self._watch_tree(folder, new_path)
+
+        # A change during a run may have been missed by it: queue one rerun
+        # (coalesced, also covers bisync's own writes) instead of debouncing
+        if folder.running:
+            folder.rerun = True
+            return
+
+        # Restart the quiet period on every event
+        if folder.debounce_id:
+            GLib.source_remove(folder.debounce_id)
+        folder.debounce_id = GLib.timeout_add_seconds(DEBOUNCE_SECONDS, self._on_debounced, folder)
+
+    def _on_debounced(self, folder):
+        folder.debounce_id = 0
+        self.sync_folder(folder)
+        return False
+
+    def _on_timer(self, folder):
+        self.sync_folder(folder)
+        return True
+
+    def resync(self, folder):
+        """Runs a full --resync, needed on first use or after bisync gives up."""
+        folder.force_resync = True
+        self.sync_folder(folder)
+
+    def sync_folder(self, folder):
+        """Starts a bisync for folder in a background thread, or queues one rerun."""
+        if folder.running:
+            folder.rerun = True
+            return
+        if not self.controller.check_config():
+            return
+        if not self.controller.rclone_supports("bisync"):
+            folder.state = ERROR
+            folder.last_error = "rclone is too old for bisync"
+            self.emit('sync-status', folder.status())
+            return
+
+        cmd = self._build_command(folder)
+        folder.running = True
+        folder.state = SYNCING
+        self.emit('sync-status', folder.status())
+
+        def _run():
+            logger.info(f"Running: {' '.join(cmd)}")
+            try:
+                # Popen rather than run() so stop() can terminate it
+                folder.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL,
+                                                  stderr=subprocess.PIPE, text=True)
+                _, stderr = folder.process.communicate()
+                GLib.idle_add(self._on_sync_done, folder, folder.process.returncode, stderr)
+            except Exception as e:
+                GLib.idle_add(self._on_sync_done, folder, -1, str(e))
+
+        threading.Thread(target=_run, daemon=True).start()
+
+    def _build_command(self, folder):
+        settings = self.controller.get_settings()
+        cmd = [
+            self.controller.rclone_path,
+            "bisync",
+            folder.local,
+            f"{self.controller.get_remote_name()}{folder.remote}",
+            "--transfers", str(int(settings.get("sync_transfers") or 4)),
+            "--create-empty-src-dirs",
+            "-v"
+        ]
+        if self.controller.rclone_supports("bisync-recover"):
+            # Keep both sides of a conflict, newest wins the original name
+            cmd += ["--conflict-resolve", "newer", "--conflict-loser", "num",
+                    "--resilient", "--recover", "--max-lock", "2m"]
+        if not folder.initialized or folder.force_resync:
+            cmd.append("--resync")
+        return cmd
+
+    def _on_sync_done(self, folder, returncode, output):
+        folder.running = False
+        folder.process = None
+        if folder not in self.folders:
+            # Stopped (logged out, or restarted with new settings) meanwhile:
+            # saving would drop every folder's state and the row is gone
+            return False
+        folder.force_resync = False
+        folder.conflicts = output.count("New or changed in both paths")
+
+        if returncode == 0:
+            folder.state = IDLE
+            folder.last_error = None
+            folder.last_sync = time.time()
+            folder.initialized = True
+            self._save_state()
+        else:
+            errors = [line for line in output.splitlines() if "ERROR" in line or "Bisync aborted" in line]
+            folder.last_error = errors[-1].strip() if errors else f"rclone bisync exited with code {returncode}"
+            if "--resync" in output:
+                # bisync refuses to continue without a full resync
+                folder.state = NEEDS_RESYNC
+            else:
+                folder.state = ERROR
+            logger.error(f"Sync of {folder.local} failed: {folder.last_error}")
+
+        self.emit('sync-status', folder.status())
+
+        if folder.rerun and folder.state != NEEDS_RESYNC and folder in self.folders:
+            folder.rerun = False
+            self.sync_folder(folder)
+        return False
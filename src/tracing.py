@@ -0,0 +1,71 @@
+import os
+import time
+import logging
+
+logger = logging.getLogger("ProtonDriveTrace")
+
+TRACE_ENV = "PROTONDRIVE_TRACE"
+TRACE_FILE = os.path.expanduser("~/.cache/protondrive-gui/startup.log")
+
+def _process_age():
+    """Seconds since this process was exec'd, read from /proc (0.0 if unavailable)."""
+    try:
+        with open("/proc/self/stat", "r") as f:
+            # Field 22 is starttime in clock ticks since boot. Split after the
+            # ")" so a command name with spaces cannot shift the fields.
+            fields = f.read().rsplit(")", 1)[1].split()
+        start_ticks = int(fields[19])
+        with open("/proc/uptime", "r") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except Exception:
+        return 0.0
+
+class StartupTrace:
+    """
+    Records per-phase startup timestamps relative to process start.
+
+    Enabled with PROTONDRIVE_TRACE=1 (writes to ~/.cache/protondrive-gui/startup.log)
+    or PROTONDRIVE_TRACE=/some/file. Disabled tracing costs one attribute check per mark.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.enabled = path is not None
+        # Anchor to exec time so interpreter and gi import cost are included
+        self.t0 = time.monotonic() - _process_age()
+        self.phases = []
+        self._seen = set()
+
+    @classmethod
+    def from_env(cls):
+        value = os.environ.get(TRACE_ENV, "")
+        if not value or value == "0":
+            return cls(None)
+        if value in ("1", "true", "yes"):
+            return cls(TRACE_FILE)
+        # Absolute so a bare file name still has a directory to create
+        return cls(os.path.abspath(os.path.expanduser(value)))
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.t0) * 1000.0
+
+    def mark(self, phase, once=False):
+        """Records that a startup phase was reached. With once=True repeats are ignored."""
+        if not self.enabled:
+            return
+        if once:
+            if phase in self._seen:
+                return
+            self._seen.add(phase)
+
+        ms = self.elapsed_ms()
+        self.phases.append((phase, ms))
+        line = f"{time.strftime('%Y-%m-%dT%H:%M:%S')} pid={os.getpid()} +{ms:.1f}ms {phase}"
+        logger.info(line)
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            logger.error(f"Failed to write startup trace: {e}")
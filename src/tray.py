@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import gi
+import os
 import sys
 import signal
 
@@ -17,8 +18,18 @@ except ValueError:
 
 from gi.repository import Gtk, GLib
 
+import tray_protocol as proto
+
 APPINDICATOR_ID = 'proton-drive-tray'
 
+STATE_ICONS = {
+    proto.MOUNTED: "folder-remote",
+    proto.MOUNTING: "emblem-synchronizing",
+    proto.UNMOUNTING: "emblem-synchronizing",
+    proto.ERROR: "dialog-warning",
+    proto.DISCONNECTED: "drive-harddisk",
+}
+
 class TrayIcon:
     def __init__(self):
         self.indicator = AppIndicator3.Indicator.new(
@@ -27,21 +38,39 @@ class TrayIcon:
             AppIndicator3.IndicatorCategory.APPLICATION_STATUS
         )
         self.indicator.set_status(AppIndicator3.IndicatorStatus.ACTIVE)
+        self.state = proto.default_state()
+        self.inbuf = b""
         self.indicator.set_menu(self.build_menu())
         
         # Watch stdin for updates
         GLib.io_add_watch(GLib.IOChannel(0), GLib.IO_IN, self.on_stdin_data)
 
+        self.send(proto.encode_hello())
+
     def build_menu(self):
         menu = Gtk.Menu()
+
+        self.item_status = Gtk.MenuItem(label=proto.describe(self.state))
+        self.item_status.set_sensitive(False)
+        menu.append(self.item_status)
+
+        menu.append(Gtk.SeparatorMenuItem())
         
         item_show = Gtk.MenuItem(label="Show Window")
         item_show.connect('activate', self.on_show)
         menu.append(item_show)
 
-        item_toggle = Gtk.MenuItem(label="Mount/Unmount")
-        item_toggle.connect('activate', self.on_toggle)
-        menu.append(item_toggle)
+        self.item_open = Gtk.MenuItem(label="Open Drive Folder")
+        self.item_open.connect('activate', self.on_open)
+        menu.append(self.item_open)
+
+        self.item_toggle = Gtk.MenuItem(label="Mount Drive")
+        self.item_toggle.connect('activate', self.on_toggle)
+        menu.append(self.item_toggle)
+
+        self.item_pause = Gtk.MenuItem(label="Pause Uploads")
+        self.item_pause.connect('activate', self.on_pause)
+        menu.append(self.item_pause)
 
         menu.append(Gtk.SeparatorMenuItem())
 
@@ -50,37 +79,73 @@ class TrayIcon:
         menu.append(item_quit)
         
         menu.show_all()
+        self.apply_state()
         return menu
 
-    def on_show(self, _):
-        print("ACTION:SHOW")
+    def apply_state(self):
+        """Reflects the current state in the icon and menu."""
+        mount = self.state["mount"]
+        mounted = mount == proto.MOUNTED
+        busy = mount in (proto.MOUNTING, proto.UNMOUNTING)
+
+        icon = STATE_ICONS.get(mount, "drive-harddisk")
+        if mounted and self.state.get("error"):
+            # Mount is up but recently reported errors
+            icon = STATE_ICONS[proto.ERROR]
+        self.indicator.set_icon_full(icon, proto.describe(self.state))
+        self.item_status.set_label(proto.describe(self.state))
+        self.item_toggle.set_label("Unmount Drive" if mounted else "Mount Drive")
+        self.item_toggle.set_sensitive(not busy)
+        self.item_open.set_sensitive(mounted)
+        self.item_pause.set_label("Resume Uploads" if self.state["paused"] else "Pause Uploads")
+        self.item_pause.set_sensitive(mounted)
+
+    def send(self, line):
+        sys.stdout.write(line)
         sys.stdout.flush()
 
+    def on_show(self, _):
+        self.send(proto.encode_action("SHOW"))
+
+    def on_open(self, _):
+        self.send(proto.encode_action("OPEN"))
+
     def on_toggle(self, _):
-        print("ACTION:TOGGLE")
-        sys.stdout.flush()
+        self.send(proto.encode_action("TOGGLE"))
+
+    def on_pause(self, _):
+        self.send(proto.encode_action("RESUME" if self.state["paused"] else "PAUSE"))
 
     def on_quit(self, _):
-        print("ACTION:QUIT")
-        sys.stdout.flush()
+        self.send(proto.encode_action("QUIT"))
         Gtk.main_quit()
 
     def on_stdin_data(self, source, condition):
-        line = sys.stdin.readline()
-        if not line:
-            Gtk.main_quit()
-            return False
-            
-        line = line.strip()
-        if line.startswith("STATUS:"):
-            status = line.split(":", 1)[1]
-            # Update menu or icon based on status if needed
-            # For MVP just keep generic icon
-            pass
-        elif line == "QUIT":
+        # Read raw bytes: a buffered readline() could hold back lines the
+        # watch would never fire for again
+        data = os.read(0, 65536)
+        if not data:
             Gtk.main_quit()
             return False
-            
+
+        self.inbuf += data
+        state = None
+        while b"\n" in self.inbuf:
+            raw, self.inbuf = self.inbuf.split(b"\n", 1)
+            kind, payload = proto.parse_line(raw.decode("utf-8", "replace"))
+            if kind == "STATE":
+                # Only the newest snapshot in this batch matters
+                state = payload
+            elif kind == "STATUS":
+                # Version 1 peer, mount state only
+                state = dict(state or self.state, mount=payload)
+            elif kind == "QUIT":
+                Gtk.main_quit()
+                return False
+
+        if state is not None and state != self.state:
+            self.state = state
+            self.apply_state()
         return True
 
 def main():
@@ -0,0 +1,88 @@
+import json
+
+# Line protocol spoken over the tray helper's stdin/stdout.
+#
+# Tray -> app:  HELLO:<version>     sent once on startup
+#               ACTION:<name>       SHOW, TOGGLE, OPEN, PAUSE, RESUME, QUIT
+# App -> tray:  STATE:<json>        full state snapshot (version >= 2)
+#               STATUS:<word>       mount state only (version 1)
+#               QUIT
+PROTOCOL_VERSION = 2
+
+# Mount states carried in STATE/STATUS
+MOUNTING = "MOUNTING"
+MOUNTED = "MOUNTED"
+UNMOUNTING = "UNMOUNTING"
+DISCONNECTED = "DISCONNECTED"
+ERROR = "ERROR"
+
+def default_state():
+    return {
+        "mount": DISCONNECTED,
+        "speed": 0,        # bytes/s, all transfers
+        "pending": 0,      # uploads queued or in progress
+        "paused": False,   # uploads throttled by the user
+        "error": None,     # mount failure, or a recent error while mounted
+        "errors": 0,       # errors reported by the current mount
+    }
+
+def encode_hello():
+    return f"HELLO:{PROTOCOL_VERSION}\n"
+
+def encode_state(state):
+    return "STATE:" + json.dumps(state, sort_keys=True, separators=(",", ":")) + "\n"
+
+def encode_status(state):
+    return f"STATUS:{state['mount']}\n"
+
+def encode_action(name):
+    return f"ACTION:{name}\n"
+
+def parse_line(line):
+    """Returns (kind, payload). Unknown or malformed lines give (None, None)."""
+    line = line.strip()
+    kind, sep, payload = line.partition(":")
+    if not sep:
+        return (line, None) if line == "QUIT" else (None, None)
+
+    if kind == "HELLO":
+        try:
+            return kind, int(payload)
+        except ValueError:
+            return None, None
+    if kind == "STATE":
+        try:
+            state = default_state()
+            state.update(json.loads(payload))
+            return kind, state
+        except (ValueError, TypeError):
+            return None, None
+    if kind in ("STATUS", "ACTION"):
+        return kind, payload
+    return None, None
+
+def format_speed(bytes_per_sec):
+    for unit in ("B/s", "KB/s", "MB/s", "GB/s"):
+        if bytes_per_sec < 1024 or unit == "GB/s":
+            return f"{bytes_per_sec:.0f} {unit}" if unit == "B/s" else f"{bytes_per_sec:.1f} {unit}"
+        bytes_per_sec /= 1024.0
+
+def describe(state):
+    """One-line human summary used for the tray status item."""
+    mount = state.get("mount", DISCONNECTED)
+    if mount == ERROR:
+        return f"Error: {state.get('error') or 'mount failed'}"
+    if mount != MOUNTED:
+        return mount.capitalize()
+
+    parts = ["Mounted"]
+    if state.get("error"):
+        error = state["error"]
+        parts.append("recent error: " + (error if len(error) <= 60 else error[:57] + "..."))
+    if state.get("speed"):
+        parts.append(format_speed(state["speed"]))
+    if state.get("pending"):
+        parts.append(f"{state['pending']} pending")
+    if state.get("paused"):
+        parts.append("uploads paused")
+    return " - ".join(parts)